@@ -0,0 +1,49 @@
+import sys
+import time
+import statistics
+import subprocess
+
+
+HEAVY_MODULE_LIST = ["pycurl", "curl", "mwparserfromhell", "tomli_w", "zhconv"]
+
+# (name, python code), each one runs in a fresh interpreter.
+BENCH_LIST = [
+    ("python", "pass"),
+    ("import thbmain", "import thbmain"),
+    ("import threlease", "import threlease"),
+    (
+        "title_to_release",
+        "import threlease; threlease.title_to_release('东方红魔乡')"
+    ),
+]
+
+
+def run_once(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+def heavy_module_list(code):
+    probe = "%s\nimport sys\nprint(' '.join(m for m in %r if m in sys.modules))" % (
+        code, HEAVY_MODULE_LIST
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe], check=True, capture_output=True, text=True
+    ).stdout
+    return output.split()
+
+
+def bench(repeat=10):
+    for name, code in BENCH_LIST:
+        timing_list = [run_once(code) for i in range(0, repeat)]
+        print("%-20s median %7.1f ms  min %7.1f ms  heavy modules: %s" % (
+            name,
+            statistics.median(timing_list) * 1000,
+            min(timing_list) * 1000,
+            ", ".join(heavy_module_list(code)) or "none"
+        ))
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
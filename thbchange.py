@@ -0,0 +1,161 @@
+import json
+import hashlib
+import pathlib
+
+import thbost
+
+
+CHANGEFEED_DIR = "./data/changefeed"
+MANIFEST_FILENAME = "manifest.json"
+CHANGEFEED_FILENAME = "changefeed.json"
+CHANGEFEED_VERSION = 3
+
+
+def track_fingerprint(track):
+    text = json.dumps(track, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("UTF-8")).hexdigest()
+
+
+def flatten_fields(value, prefix=""):
+    # {"title": {"ja": ...}} becomes {"title.ja": ...}, so a diff can point
+    # at the exact title, commentary or source entry that changed. Lists
+    # are kept as a single value.
+    if not isinstance(value, dict):
+        return {prefix: value}
+
+    field_dict = {}
+    for k, v in value.items():
+        field_dict.update(flatten_fields(v, "%s.%s" % (prefix, k) if prefix else k))
+    return field_dict
+
+
+def build_manifest(ost_dir=thbost.OST_DIR):
+    # Tracks are matched between builds on their stable key, the position
+    # on the page is recorded but isn't part of the fingerprint, so one
+    # inserted track doesn't turn every later track into a modification.
+    track_dict = {}
+    for track_key, track_id, game, track in thbost.iter_tracks(ost_dir):
+        track_dict[track_key] = {
+            "position": track_id,
+            "identity": thbost.track_identity(track)[0],
+            "fingerprint": track_fingerprint(track),
+            "fields": flatten_fields(track),
+        }
+
+    build = hashlib.sha256()
+    for track_key, entry in sorted(track_dict.items()):
+        build.update(("%s %s %s\n" % (
+            track_key, entry["position"], entry["fingerprint"]
+        )).encode("UTF-8"))
+
+    return {
+        "version": CHANGEFEED_VERSION,
+        "build": build.hexdigest(),
+        "tracks": track_dict,
+    }
+
+
+def diff_fields(old_field_dict, new_field_dict):
+    diff = {}
+    for field in sorted(old_field_dict.keys() | new_field_dict.keys()):
+        old = old_field_dict.get(field)
+        new = new_field_dict.get(field)
+        if old != new:
+            diff[field] = {"old": old, "new": new}
+    return diff
+
+
+def diff_manifest(old_manifest, new_manifest):
+    old_track_dict = old_manifest["tracks"] if old_manifest else {}
+    new_track_dict = new_manifest["tracks"]
+
+    added = sorted(new_track_dict.keys() - old_track_dict.keys())
+    removed = sorted(old_track_dict.keys() - new_track_dict.keys())
+
+    # (old key, new key) of every track present in both builds.
+    pair_list = [
+        (track_key, track_key)
+        for track_key in sorted(old_track_dict.keys() & new_track_dict.keys())
+    ]
+
+    # Tracks without a title template or linked page are keyed on their
+    # titles and source files, so editing those changes the key. Pair up
+    # such a removed and added track at the same position and report them
+    # as one modified track instead.
+    fallback_removed = {
+        old_track_dict[track_key]["position"]: track_key
+        for track_key in removed
+        if old_track_dict[track_key]["identity"] == "title"
+    }
+    for track_key in list(added):
+        new = new_track_dict[track_key]
+        old_track_key = fallback_removed.get(new["position"])
+        if new["identity"] == "title" and old_track_key:
+            pair_list.append((old_track_key, track_key))
+            added.remove(track_key)
+            removed.remove(old_track_key)
+
+    modified = {}
+    for old_track_key, track_key in pair_list:
+        old = old_track_dict[old_track_key]
+        new = new_track_dict[track_key]
+        # Only unpack the fields when the fingerprints disagree.
+        if old["fingerprint"] != new["fingerprint"]:
+            modified[track_key] = {
+                "position": new["position"],
+                "fields": diff_fields(old["fields"], new["fields"]),
+            }
+            if old_track_key != track_key:
+                modified[track_key]["previous-key"] = old_track_key
+
+    return {
+        "version": CHANGEFEED_VERSION,
+        "previous-build": old_manifest["build"] if old_manifest else None,
+        "build": new_manifest["build"],
+        "added": {
+            track_key: new_track_dict[track_key]["position"]
+            for track_key in added
+        },
+        "removed": {
+            track_key: old_track_dict[track_key]["position"]
+            for track_key in removed
+        },
+        "modified": modified,
+    }
+
+
+def read_manifest(path):
+    try:
+        with open(str(path), "r") as f:
+            manifest = json.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+    if manifest["version"] != CHANGEFEED_VERSION:
+        # Treat an unknown manifest as no manifest, everything is "added".
+        return None
+    return manifest
+
+
+def write_changefeed(ost_dir=thbost.OST_DIR, changefeed_dir=CHANGEFEED_DIR):
+    manifest_path = pathlib.Path(changefeed_dir) / MANIFEST_FILENAME
+    changefeed_path = pathlib.Path(changefeed_dir) / CHANGEFEED_FILENAME
+
+    old_manifest = read_manifest(manifest_path)
+    new_manifest = build_manifest(ost_dir)
+    changefeed = diff_manifest(old_manifest, new_manifest)
+
+    with open(str(changefeed_path), "w+") as f:
+        f.write(json.dumps(changefeed, ensure_ascii=False, indent=1))
+    with open(str(manifest_path), "w+") as f:
+        f.write(json.dumps(new_manifest, ensure_ascii=False))
+    return changefeed
+
+
+if __name__ == "__main__":
+    changefeed = write_changefeed()
+    print("added %d, removed %d, modified %d" % (
+        len(changefeed["added"]),
+        len(changefeed["removed"]),
+        len(changefeed["modified"])
+    ))
@@ -0,0 +1,122 @@
+import sys
+import json
+import pathlib
+from collections import defaultdict
+
+import thbost
+
+
+GRAPH_PATH = "./data/graph/thbgraph.json"
+GRAPH_VERSION = 2
+
+# Tracks sharing the same wiki page are the same work, tracks sharing the
+# same title template entry are the same recording reused in another release.
+RELATION_LIST = ["linked-page", "title-template"]
+
+
+def track_relation_key(track):
+    thbwiki = track["extra"]["thbwiki"]
+
+    key_dict = {}
+    if "linked-page" in thbwiki:
+        key_dict["linked-page"] = thbwiki["linked-page"]["page"]
+    if "title-template" in thbwiki:
+        name, game_track_id = thbwiki["title-template"]
+        key_dict["title-template"] = "%s|%s" % (name, game_track_id)
+    return key_dict
+
+
+def build_graph(ost_dir=thbost.OST_DIR):
+    group = {relation: defaultdict(list) for relation in RELATION_LIST}
+    track_dict = {}
+
+    # Nodes are stable track keys, the positional ID is only an attribute,
+    # so inserting a track on a wiki page doesn't shift anyone's neighbors.
+    for track_key, track_id, game, track in thbost.iter_tracks(ost_dir):
+        track_dict[track_key] = {"position": track_id}
+        for relation, key in track_relation_key(track).items():
+            group[relation][key].append(track_key)
+
+    # Expand every group into per-track adjacency lists once here, so
+    # a neighbor query is a plain dict lookup.
+    adjacency = defaultdict(lambda: defaultdict(list))
+    for relation in RELATION_LIST:
+        for key, track_key_list in group[relation].items():
+            for track_key in track_key_list:
+                for neighbor in track_key_list:
+                    if neighbor != track_key:
+                        adjacency[track_key][relation].append(neighbor)
+
+    return {
+        "version": GRAPH_VERSION,
+        "tracks": track_dict,
+        "group": {
+            relation: {
+                key: track_key_list
+                for key, track_key_list in group[relation].items()
+                if len(track_key_list) > 1
+            }
+            for relation in RELATION_LIST
+        },
+        "adjacency": adjacency,
+    }
+
+
+def write_graph(graph, path=GRAPH_PATH):
+    path = pathlib.Path(path)
+    with open(str(path), "w+") as f:
+        f.write(json.dumps(graph, ensure_ascii=False))
+
+
+class TrackGraph():
+    def __init__(self, path=GRAPH_PATH):
+        with open(str(path), "r") as f:
+            graph = json.loads(f.read())
+
+        if graph["version"] != GRAPH_VERSION:
+            raise ValueError(
+                "Unknown graph version: %s, rebuild the graph!" % graph["version"]
+            )
+        self.tracks = graph["tracks"]
+        self.group = graph["group"]
+        self.position = {
+            track["position"]: track_key
+            for track_key, track in self.tracks.items()
+        }
+
+        # Neighbor lists are handed out as tuples, so callers can't modify
+        # the graph by accident. None is the union of all relations.
+        self.adjacency = {}
+        for track_key, relation_dict in graph["adjacency"].items():
+            self.adjacency[track_key] = {
+                relation: tuple(relation_dict.get(relation, []))
+                for relation in RELATION_LIST
+            }
+            self.adjacency[track_key][None] = tuple(dict.fromkeys(
+                neighbor
+                for relation in RELATION_LIST
+                for neighbor in relation_dict.get(relation, [])
+            ))
+
+    def resolve(self, track_key_or_position):
+        # Accepts either a stable key or a positional ID such as "TH6/1".
+        return self.position.get(track_key_or_position, track_key_or_position)
+
+    def neighbors(self, track_key, relation=None):
+        if relation is not None and relation not in RELATION_LIST:
+            raise ValueError("Unknown relation: %s" % relation)
+        return self.adjacency.get(track_key, {}).get(relation, ())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        graph = TrackGraph()
+        for track in sys.argv[1:]:
+            track_key = graph.resolve(track)
+            for relation in RELATION_LIST:
+                print(track_key, relation, [
+                    "%s (%s)" % (neighbor, graph.tracks[neighbor]["position"])
+                    for neighbor in graph.neighbors(track_key, relation)
+                ])
+    else:
+        write_graph(build_graph())
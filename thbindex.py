@@ -0,0 +1,151 @@
+import re
+import sys
+import json
+import math
+import heapq
+import pathlib
+import unicodedata
+from collections import defaultdict
+
+import zhconv
+
+import thbost
+
+
+INDEX_PATH = "./data/index/thbindex.json"
+INDEX_VERSION = 2
+
+# Matches on titles are worth more than matches buried in the commentary.
+FIELD_WEIGHT = {
+    "title": 4.0,
+    "composer": 2.0,
+    "context": 2.0,
+    "commentary": 1.0,
+}
+
+# CJK text has no word boundaries, so it's indexed as overlapping n-grams.
+# Unigrams are indexed for single-character queries only, a longer query is
+# matched on bigrams alone, otherwise single-character hits would drown out
+# the phrase matches.
+INDEX_NGRAM_SIZE_LIST = [1, 2]
+QUERY_NGRAM_SIZE_LIST = [2]
+
+_REGEX_TOKEN = re.compile(
+    r'(?P<cjk>[぀-ヿ㐀-䶿一-鿿豈-﫿]+)'
+    r'|(?P<word>[0-9a-zÀ-ɏ]+)'
+)
+
+
+def normalize(text):
+    # NFKC folds full-width Latin and half-width kana, zhconv folds
+    # traditional Chinese into simplified Chinese, so "紅魔" and "红魔"
+    # share the same tokens. Japanese-only kanji forms such as 郷 or 図
+    # are not folded, so "魔郷" still doesn't match "魔乡".
+    text = unicodedata.normalize("NFKC", text).lower()
+    return zhconv.convert(text, "zh-cn")
+
+
+def tokenize(text, ngram_size_list=INDEX_NGRAM_SIZE_LIST):
+    token_list = []
+
+    for match in _REGEX_TOKEN.finditer(normalize(text)):
+        if match.group("word"):
+            token_list.append(match.group("word"))
+            continue
+
+        run = match.group("cjk")
+        for n in ngram_size_list if len(run) > 1 else [1]:
+            for i in range(0, len(run) - n + 1):
+                token_list.append(run[i:i + n])
+    return token_list
+
+
+def track_field_text(track):
+    context = track.get("context", {})
+    return {
+        "title": list(track.get("title", {}).values()),
+        "composer": list(track.get("composer", {}).values()),
+        "context": (
+            context.get("character-list", {}).get("zh-hans", []) +
+            context.get("scenario-list", {}).get("zh-hans", [])
+        ),
+        "commentary": list(track.get("commentary", {}).values()),
+    }
+
+
+def build_index(ost_dir=thbost.OST_DIR):
+    document_list = []
+    term_freq = defaultdict(dict)
+
+    for track_key, track_id, game, track in thbost.iter_tracks(ost_dir):
+        doc = len(document_list)
+        document_list.append({
+            "key": track_key,
+            "id": track_id,
+            "game": game.get("title", {}),
+            "title": track.get("title", {}),
+        })
+
+        for field, text_list in track_field_text(track).items():
+            for text in text_list:
+                for token in tokenize(text):
+                    term_freq[token][doc] = (
+                        term_freq[token].get(doc, 0) + FIELD_WEIGHT[field]
+                    )
+
+    # Precompute tf-idf per posting, so a query is only a handful of
+    # dict lookups and additions.
+    postings = {}
+    for token, doc_dict in term_freq.items():
+        idf = math.log(1 + len(document_list) / len(doc_dict))
+        postings[token] = [
+            [doc, round((1 + math.log(tf)) * idf, 4)]
+            for doc, tf in sorted(doc_dict.items())
+        ]
+
+    return {
+        "version": INDEX_VERSION,
+        "documents": document_list,
+        "postings": postings,
+    }
+
+
+def write_index(index, path=INDEX_PATH):
+    path = pathlib.Path(path)
+    with open(str(path), "w+") as f:
+        f.write(json.dumps(index, ensure_ascii=False))
+
+
+class SearchIndex():
+    def __init__(self, path=INDEX_PATH):
+        with open(str(path), "r") as f:
+            index = json.loads(f.read())
+
+        if index["version"] != INDEX_VERSION:
+            raise ValueError(
+                "Unknown index version: %s, rebuild the index!" % index["version"]
+            )
+        self.documents = index["documents"]
+        self.postings = index["postings"]
+
+    def search(self, query, limit=10):
+        score_dict = defaultdict(float)
+
+        for token in set(tokenize(query, QUERY_NGRAM_SIZE_LIST)):
+            for doc, score in self.postings.get(token, []):
+                score_dict[doc] += score
+
+        top_list = heapq.nlargest(
+            limit, score_dict.items(), key=lambda item: item[1]
+        )
+        return [
+            (score, self.documents[doc]) for doc, score in top_list
+        ]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for score, document in SearchIndex().search(" ".join(sys.argv[1:])):
+            print("%8.3f %s %s" % (score, document["id"], document["title"]))
+    else:
+        write_index(build_index())
@@ -1,15 +1,17 @@
-import os
-import re
-import curlrequests
+import sys
 import json
-from pprint import pprint
-import tomli_w
+import argparse
 import pathlib
+from pprint import pprint
 
+import thbchange
 import thbconstant
-import thbparser
 import threlease
 
+# Heavy dependencies (pycurl, mwparserfromhell, tomli_w, zhconv) are
+# imported inside the subcommands that need them, so that e.g. a query
+# against the generated data doesn't pay for loading the crawler.
+
 
 OUTPUT_DIR = "./data/ost"
 
@@ -29,6 +31,8 @@ def fetch_musicroom_page_list(api_endpoint):
 
 
 def fetch_game_musicroom_page(api_endpoint, pagetitle):
+    import thbparser
+
     body = api_endpoint.get(
         action="query", prop="revisions",
         rvprop="content", rvslots="main", titles=pagetitle,
@@ -41,7 +45,10 @@ def fetch_game_musicroom_page(api_endpoint, pagetitle):
     return work_json
 
 
-if __name__ == "__main__":
+def crawl(args):
+    import curlrequests
+    import tomli_w
+
     api_endpoint = curlrequests.ApiRequest(thbconstant.API_URL)
 
     for i in fetch_musicroom_page_list(api_endpoint):
@@ -51,7 +58,9 @@ if __name__ == "__main__":
         music_list = fetch_game_musicroom_page(api_endpoint, i)
         if not music_list:
             print("Failed to obtain music information for %s!" % i)
-            break
+            # Leave the manifest at the last complete build, so the next
+            # successful crawl reports everything that changed since then.
+            return 1
         else:
             pass
             #pprint(music_list)
@@ -71,7 +80,7 @@ if __name__ == "__main__":
         except IndexError:
             filename = game_name
             music_data_structure["title"]["zh-hans"] = filename
-            
+
         pprint(music_data_structure)
 
         path = pathlib.Path(OUTPUT_DIR) / ("%s.toml" % filename)
@@ -81,3 +90,89 @@ if __name__ == "__main__":
         #os.system("read && clear")
     #pprint(fetch_game_musicroom_page("东方地灵殿/Music"))
     #(fetch_game_musicroom_page("东方怪绮谈/Music"))
+
+    changefeed = thbchange.write_changefeed(OUTPUT_DIR)
+    print("Changes since the last build: added %d, removed %d, modified %d" % (
+        len(changefeed["added"]),
+        len(changefeed["removed"]),
+        len(changefeed["modified"])
+    ))
+
+
+def release(args):
+    threlease.fetch_threlease_data()
+
+
+def query(args):
+    text = " ".join(args.text)
+
+    if args.release:
+        try:
+            game_threlease = threlease.title_to_release(text)
+        except IndexError:
+            print("No release found for %s!" % text)
+            return 1
+        print("TH%s" % game_threlease, threlease.release_to_title(game_threlease))
+    elif args.neighbors:
+        import thbgraph
+
+        graph = thbgraph.TrackGraph()
+        track_key = graph.resolve(text)
+        if track_key not in graph.tracks:
+            print("No track found for %s!" % text)
+            return 1
+        for relation in thbgraph.RELATION_LIST:
+            print(relation, [
+                "%s (%s)" % (neighbor, graph.tracks[neighbor]["position"])
+                for neighbor in graph.neighbors(track_key, relation)
+            ])
+    else:
+        import thbindex
+
+        for score, document in thbindex.SearchIndex().search(text, args.limit):
+            print("%8.3f %s %s" % (score, document["id"], document["title"]))
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Convert Touhou soundtracks from THBwiki to TOML data."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    parser_crawl = subparsers.add_parser(
+        "crawl", help="fetch all Music Room pages into %s" % OUTPUT_DIR
+    )
+    parser_crawl.set_defaults(func=crawl)
+
+    parser_release = subparsers.add_parser(
+        "release", help="refresh the release list from Wikidata"
+    )
+    parser_release.set_defaults(func=release)
+
+    parser_query = subparsers.add_parser(
+        "query", help="search the generated data"
+    )
+    parser_query.add_argument("text", nargs="+")
+    parser_query.add_argument("-n", "--limit", type=int, default=10)
+    mode = parser_query.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--release", action="store_true",
+        help="resolve a game title to its release number"
+    )
+    mode.add_argument(
+        "--neighbors", action="store_true",
+        help="list tracks related to a track key or position, e.g. TH6/1"
+    )
+    parser_query.set_defaults(func=query)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # Plain "python3 thbmain.py" keeps crawling, as it always did.
+        args.func = crawl
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    sys.exit(args.func(args))
@@ -0,0 +1,65 @@
+import json
+import hashlib
+import pathlib
+import tomllib
+
+
+OST_DIR = "./data/ost"
+
+
+def ost_path_list(ost_dir=OST_DIR):
+    return sorted(pathlib.Path(ost_dir).glob("*.toml"))
+
+
+def load_game(path):
+    with open(str(path), "rb") as f:
+        return tomllib.load(f)
+
+
+def track_id(game_id, idx):
+    # Positional track IDs, "<output filename>/<1-based position>", e.g.
+    # "TH6/1". Readable, but they shift when the wiki page gains or loses
+    # a track, so don't persist them, use track_key() instead.
+    return "%s/%d" % (game_id, idx + 1)
+
+
+def track_identity(track):
+    # What the track *is*, independent of where it sits on the page:
+    # the title template entry or linked page THBwiki resolved it to,
+    # otherwise its titles and source files.
+    thbwiki = track["extra"]["thbwiki"]
+    if "title-template" in thbwiki:
+        return ["title-template"] + thbwiki["title-template"]
+    if "linked-page" in thbwiki:
+        return ["linked-page", thbwiki["linked-page"]["page"]]
+    return [
+        "title", track.get("title", {}),
+        sorted(
+            filename
+            for source in track.get("source", {}).values()
+            for filename in source["file-list"]
+        )
+    ]
+
+
+def track_key(game_id, identity, occurrence=0):
+    # Stable track keys, "<output filename>/<hash of the identity>". The
+    # same recording can be listed twice on one page (e.g. TH6/1 and
+    # TH6/18), later copies are told apart by their occurrence count.
+    text = json.dumps([identity, occurrence], sort_keys=True, ensure_ascii=False)
+    return "%s/%s" % (game_id, hashlib.sha256(text.encode("UTF-8")).hexdigest()[:12])
+
+
+def iter_tracks(ost_dir=OST_DIR):
+    for path in ost_path_list(ost_dir):
+        game = load_game(path)
+        occurrence = {}
+        for idx, track in enumerate(game["soundtrack-list"]):
+            identity = track_identity(track)
+            text = json.dumps(identity, sort_keys=True, ensure_ascii=False)
+            occurrence[text] = occurrence.get(text, -1) + 1
+
+            yield (
+                track_key(path.stem, identity, occurrence[text]),
+                track_id(path.stem, idx), game, track
+            )
@@ -1,8 +1,39 @@
 import re
+import pathlib
+import tomllib
 import thbtemplate
 import mwparserfromhell
 
 
+TABLE_PATH = pathlib.Path(__file__).parent / "thbparser.toml"
+UNKNOWN_FORMAT = "unknown"
+
+_REGEX_REF = re.compile(r'<ref>.*?</ref>')
+
+
+def _load_table(path=TABLE_PATH):
+    with open(str(path), "rb") as f:
+        table = tomllib.load(f)
+
+    # The keys become a single alternation, so classifying a line is one
+    # regex call instead of a loop over the table.
+    key_regex = re.compile("|".join(
+        re.escape(key) for key in table["musicroom-keys"]
+    ))
+
+    # Formats are tried in table order, a plain substring test per entry
+    # on a filename that is only lowercased once.
+    format_list = [
+        (entry["substring"].lower(), entry["format"])
+        for entry in table["filename-format"]
+    ]
+
+    return key_regex, format_list
+
+
+_REGEX_KEY, _FORMAT_LIST = _load_table()
+
+
 def thbwiki_musicroom_splittracks(lines, keyword="category"):
     started = False
 
@@ -24,13 +55,9 @@ def thbwiki_musicroom_splittracks(lines, keyword="category"):
 
 
 def thbwiki_musicroom_splitkeys(lines):
-    KEYS = [
-        "category", "titleJA", "titleja", "titleZH", "titlezh", "composer", "source", "mp3", "ja", "zh"
-    ]
-
     item_buffer = None
     for line in lines:
-        if any(line.startswith(key) for key in KEYS):
+        if _REGEX_KEY.match(line):
             if item_buffer:
                 yield "\n".join(item_buffer)
             item_buffer = [line]
@@ -105,16 +132,16 @@ def thbwiki_extract_per_track_commentary(entry_list):
     retval["commentary"] = {}
     retval["source"] = {}
 
-    REGEX_REF = re.compile(r'<ref>.*?</ref>')
-
     for k, v in commentary.items():
         is_filename = "." in k or '\\' in k
 
         if is_filename:
             k = k.replace("，", ",")
-            k = REGEX_REF.sub("", k)
+            k = _REGEX_REF.sub("", k)
             for filename in k.split(","):
                 format = thbwiki_filename_to_format(filename)
+                if format == UNKNOWN_FORMAT:
+                    print("Unknown format in filename %s!" % filename)
                 if format not in retval["source"]:
                     retval["source"][format] = {"file-list": [], "file_metadata": {}}
 
@@ -132,26 +159,11 @@ def thbwiki_extract_per_track_commentary(entry_list):
 
 
 def thbwiki_filename_to_format(name):
-    if ".m2" in name.lower():
-        return "fm26"
-    elif ".m26" in name.lower():
-        return "fm26"
-    elif ".m86" in name.lower():
-        return "fm86"
-    elif ".mmd" in name.lower():
-        return "midi"
-    elif ".mid" in name.lower():
-        return "midi"
-    elif "music\\" in name.lower():
-        return "data"
-    elif ".dat" in name.lower():
-        return "data"
-    elif "_music.txt" in name.lower():
-        return "data"
-    elif ".m" in name.lower():
-        return "fm86"
-    else:
-        assert False, "unknown format in filename %s!" % name
+    name = name.lower()
+    for substring, format in _FORMAT_LIST:
+        if substring in name:
+            return format
+    return UNKNOWN_FORMAT
 
 
 def thbwiki_kv_to_json(entry_list):
@@ -1,10 +1,7 @@
 from functools import cache
 import json
 import pathlib
-import curlrequests
 import tomllib
-import tomli_w
-import zhconv
 
 
 WIKIDATA_API = "https://query.wikidata.org/sparql"
@@ -43,6 +40,12 @@ def title_to_release(title):
 
 
 def fetch_threlease_data():
+    # Only needed for refreshing the data, not for lookups, zhconv in
+    # particular takes a while to import.
+    import curlrequests
+    import tomli_w
+    import zhconv
+
     query = """
         SELECT ?game ?thReleaseValue ?titleJa ?titleEn ?titleZh ?titleZhHans WHERE {
             wd:Q907907 p:P527 [